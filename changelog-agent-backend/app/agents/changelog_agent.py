@@ -1,9 +1,8 @@
 from agents import Agent, AgentOutputSchema, function_tool, RunContextWrapper
 from app.agents import database_operations
 from app.agents.context import FormContext
-from app.agents.tool_models import RecordData, RecordUpdate
+from app.agents.tool_models import RecordData, RecordUpdate, ChangeOperation
 from app.models.schemas import AgentOutput
-import json
 
 
 def tool_error_handler(ctx: RunContextWrapper[FormContext], error: Exception) -> str:
@@ -51,7 +50,7 @@ async def create_database_record(
     """
     return await database_operations.create_record(
         table_name,
-        json.dumps(record_data.data),
+        record_data.data,
         ctx.context.db_path
     )
 
@@ -80,7 +79,7 @@ async def update_database_record(
     return await database_operations.update_record(
         table_name,
         record_id,
-        json.dumps(updates.updates),
+        updates.updates,
         ctx.context.db_path
     )
 
@@ -111,6 +110,34 @@ async def delete_database_record(
     )
 
 
+@function_tool(failure_error_function=tool_error_handler, strict_mode=False)
+async def validate_database_changes(
+    ctx: RunContextWrapper[FormContext],
+    operations: list[ChangeOperation]
+) -> str:
+    """
+    Validate a batch of related inserts/updates/deletes in ONE transaction.
+    This validates all operations together but does NOT modify the database
+    (the transaction is rolled back).
+
+    Prefer this over repeated single-record calls when one request produces
+    several related changes: it catches cross-record problems and needs only
+    one round trip.
+
+    Args:
+        operations: List of operations applied in order. Each has an 'action'
+                   ("insert", "update" or "delete"), a 'table_name', and either
+                   'data' (insert) or 'record_id' plus 'updates' (update/delete)
+
+    Returns:
+        JSON string containing the merged change plan keyed by table name
+    """
+    return await database_operations.validate_changes(
+        [op.model_dump(exclude_none=True) for op in operations],
+        ctx.context.db_path
+    )
+
+
 AGENT_INSTRUCTIONS = """
 You are a changelog generator for a form management system.
 
@@ -163,6 +190,17 @@ delete_database_record(
 )
 ```
 
+**For several related changes at once:**
+```
+validate_database_changes(
+    operations=[
+        {"action": "insert", "table_name": "option_items", "data": {"id": "$opt_paris", ...}},
+        {"action": "update", "table_name": "forms", "record_id": "existing-uuid-123", "updates": {"title": "New Title"}}
+    ]
+)
+```
+This validates everything in one transaction and returns the merged changelog.
+
 Each tool validates the operation and returns a JSON change plan fragment. When calling the tools ensure that they strictly
 adhere to the user's request. You must justify every change and make sure it does not make assumptions beyond the request.
 If there is clarity needed, ask the user before proceeding with the clarification output format.
@@ -234,7 +272,8 @@ form_agent = Agent[FormContext](
         query_forms_database,
         create_database_record,
         update_database_record,
-        delete_database_record
+        delete_database_record,
+        validate_database_changes
     ],
     model="gpt-5",
     output_type=AgentOutputSchema(AgentOutput, strict_json_schema=False)
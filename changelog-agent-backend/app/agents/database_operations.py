@@ -1,32 +1,143 @@
 import aiosqlite
+import asyncio
 import json
+import orjson
+import re
+import time
+from collections import OrderedDict, deque
 from typing import Callable, Any
-from .validators import validate_table_name, validate_columns, ValidationError
+from .validators import VALID_TABLES, validate_table_name, validate_columns, ValidationError
 
 
 MAX_QUERY_RESULTS = 1000
+POOL_SIZE = 5
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize to compact JSON; pretty-printing only inflates token counts."""
+    return orjson.dumps(obj).decode("utf-8")
+
+
+def _error(message: str) -> str:
+    """Wrap an error message in a structured JSON object for the tool caller."""
+    return _dumps({"error": message})
+
+
+class ConnectionPool:
+    """
+    Bounded pool of warm aiosqlite connections for a single database file.
+
+    Opening a SQLite connection spawns a worker thread and re-runs setup
+    PRAGMAs, which dominates the cost of the small queries the agent issues.
+    Connections are opened lazily up to max_size, configured once, and then
+    reused by every tool call.
+    """
+
+    def __init__(self, db_path: str, max_size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.max_size = max_size
+        self._idle: deque[aiosqlite.Connection] = deque()
+        self._semaphore = asyncio.Semaphore(max_size)
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        # cached_statements sizes SQLite's per-connection prepared-statement
+        # cache; the fixed check/insert/update/delete templates all hit it.
+        # uri=True is a no-op for plain paths but lets callers (tests) pass
+        # file: URIs such as a shared-cache in-memory database.
+        connector = aiosqlite.connect(self.db_path, cached_statements=256, uri=True)
+        # Pooled connections live for the process; daemonize their worker
+        # threads so they never block interpreter shutdown. Recent aiosqlite
+        # keeps the worker in a private _thread; older releases make the
+        # Connection itself the Thread.
+        getattr(connector, "_thread", connector).daemon = True
+        db = await connector
+        db.row_factory = aiosqlite.Row
+        await db.execute("PRAGMA foreign_keys = OFF")
+        await db.execute("PRAGMA journal_mode = WAL")
+        await db.execute("PRAGMA synchronous = NORMAL")
+        await db.execute("PRAGMA temp_store = MEMORY")
+        await db.execute("PRAGMA mmap_size = 268435456")
+        return db
+
+    async def _acquire(self) -> aiosqlite.Connection:
+        await self._semaphore.acquire()
+        if self._idle:
+            return self._idle.popleft()
+        try:
+            return await self._open_connection()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def _release(self, conn: aiosqlite.Connection) -> None:
+        self._idle.append(conn)
+        self._semaphore.release()
+
+    def acquire(self) -> "_PooledConnection":
+        """Acquire a connection as an async context manager."""
+        return _PooledConnection(self)
+
+
+class _PooledConnection:
+    """Async context manager that returns its connection to the pool on exit."""
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+        self._conn: aiosqlite.Connection | None = None
+
+    async def __aenter__(self) -> aiosqlite.Connection:
+        self._conn = await self._pool._acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._conn is not None:
+            self._pool._release(self._conn)
+            self._conn = None
+
+
+# Pools are keyed by (db_path, event loop) because asyncio primitives and
+# pending aiosqlite futures are bound to the loop they were created on.
+_pools: dict[tuple[str, Any], ConnectionPool] = {}
+
+
+def _get_pool(db_path: str) -> ConnectionPool:
+    key = (db_path, asyncio.get_running_loop())
+    pool = _pools.get(key)
+    if pool is None:
+        pool = ConnectionPool(db_path)
+        _pools[key] = pool
+    return pool
+
+
+_SELECT_RE = re.compile(r"^\s*select\b", re.IGNORECASE)
+# `replace` is deliberately absent: the statement is already required to
+# start with SELECT, where REPLACE can only appear as the builtin
+# replace() function, never as the INSERT OR REPLACE statement.
+_FORBIDDEN_RE = re.compile(
+    r"\b(drop|delete|insert|update|alter|create|pragma|attach|detach|truncate)\b",
+    re.IGNORECASE
+)
+# Quoted strings/identifiers are blanked out before the keyword scan so a
+# filter like title = 'update this' isn't rejected.
+_QUOTED_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
 
 
 def _validate_select_query(sql: str) -> None:
     """
     Validate that SQL query is a safe SELECT statement.
-    
+
     Args:
         sql: SQL query string to validate
-        
+
     Raises:
         ValidationError: If query is not a safe SELECT statement
     """
-    sql_lower = sql.strip().lower()
-    
-    if not sql_lower.startswith('select'):
+    if not _SELECT_RE.match(sql):
         raise ValidationError("Only SELECT queries are allowed")
-    
-    forbidden = ['drop', 'delete', 'insert', 'update', 'alter', 'create', 
-                 'pragma', 'attach', 'detach', 'truncate', 'replace']
-    for keyword in forbidden:
-        if f' {keyword} ' in f' {sql_lower} ' or sql_lower.endswith(f' {keyword}'):
-            raise ValidationError(f"Query contains forbidden keyword: {keyword}")
+
+    match = _FORBIDDEN_RE.search(_QUOTED_RE.sub(" ", sql))
+    if match:
+        raise ValidationError(f"Query contains forbidden keyword: {match.group(1).lower()}")
 
 
 async def _validate_and_parse_json(data: str, error_prefix: str) -> tuple[dict | None, str | None]:
@@ -37,6 +148,76 @@ async def _validate_and_parse_json(data: str, error_prefix: str) -> tuple[dict |
         return None, f"{error_prefix}: {str(e)}"
 
 
+# SQL identifiers are only ever taken from these whitelist-derived dispatch
+# tables, never from caller-supplied strings: an unvalidated table name fails
+# the dict lookup instead of reaching an f-string. Statement templates are
+# cached by (table, column tuple) — the agent issues the same handful of
+# statement shapes over and over, so each is built exactly once and the
+# identical string also hits SQLite's internal prepared-statement cache.
+_TABLE_IDENT = {table: table for table in VALID_TABLES}
+_DELETE_SQL = {table: f"DELETE FROM {table} WHERE id = ? RETURNING id" for table in VALID_TABLES}
+_INSERT_SQL_CACHE: dict[tuple[str, tuple[str, ...]], str] = {}
+_UPDATE_SQL_CACHE: dict[tuple[str, tuple[str, ...]], str] = {}
+
+
+def _insert_sql(table_name: str, columns: tuple[str, ...]) -> str:
+    key = (table_name, columns)
+    sql = _INSERT_SQL_CACHE.get(key)
+    if sql is None:
+        table = _TABLE_IDENT[table_name]
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        _INSERT_SQL_CACHE[key] = sql
+    return sql
+
+
+def _update_sql(table_name: str, columns: tuple[str, ...]) -> str:
+    key = (table_name, columns)
+    sql = _UPDATE_SQL_CACHE.get(key)
+    if sql is None:
+        table = _TABLE_IDENT[table_name]
+        set_clauses = ", ".join(f"{col} = ?" for col in columns)
+        sql = f"UPDATE {table} SET {set_clauses} WHERE id = ? RETURNING id"
+        _UPDATE_SQL_CACHE[key] = sql
+    return sql
+
+
+async def _apply_insert(db: aiosqlite.Connection, table_name: str, record_dict: dict) -> dict:
+    """Run an INSERT for the record and return its change plan fragment."""
+    columns = tuple(record_dict.keys())
+    values = [record_dict[col] for col in columns]
+
+    await db.execute(_insert_sql(table_name, columns), values)
+
+    return {"insert": [record_dict]}
+
+
+async def _apply_update(db: aiosqlite.Connection, table_name: str, record_id: str, updates_dict: dict) -> dict:
+    """Run an UPDATE for the record and return its change plan fragment."""
+    columns = tuple(updates_dict.keys())
+    values = list(updates_dict.values())
+    values.append(record_id)
+
+    # RETURNING doubles as the existence check, replacing a separate
+    # SELECT preflight round trip.
+    async with db.execute(_update_sql(table_name, columns), values) as cursor:
+        row = await cursor.fetchone()
+        if not row:
+            raise ValueError(f"Record with id '{record_id}' not found in table '{table_name}'")
+
+    return {"update": [{"id": record_id, **updates_dict}]}
+
+
+async def _apply_delete(db: aiosqlite.Connection, table_name: str, record_id: str) -> dict:
+    """Run a DELETE for the record and return its change plan fragment."""
+    async with db.execute(_DELETE_SQL[table_name], (record_id,)) as cursor:
+        row = await cursor.fetchone()
+        if not row:
+            raise ValueError(f"Record with id '{record_id}' not found in table '{table_name}'")
+
+    return {"delete": [{"id": record_id}]}
+
+
 async def _execute_in_transaction(
     table_name: str,
     db_path: str,
@@ -53,157 +234,193 @@ async def _execute_in_transaction(
     Returns:
         JSON string of change plan or error message
     """
-    async with aiosqlite.connect(db_path) as db:
-        await db.execute("PRAGMA foreign_keys = OFF")
-        
+    async with _get_pool(db_path).acquire() as db:
+        # SAVEPOINT instead of BEGIN: cheaper to open/discard on a pooled
+        # connection and always leaves it transaction-free for the next caller.
+        await db.execute("SAVEPOINT dry_run")
         try:
-            await db.execute("BEGIN")
             change_plan = await operation(db)
-            return json.dumps({table_name: change_plan}, indent=2)
+            return _dumps({table_name: change_plan})
         except aiosqlite.IntegrityError as e:
-            return f"Integrity constraint violation: {str(e)}"
+            return _error(f"Integrity constraint violation: {str(e)}")
         except ValueError as e:
-            return f"Error: {str(e)}"
+            return _error(f"Error: {str(e)}")
         except Exception as e:
-            return f"Error testing operation: {str(e)}"
+            return _error(f"Error testing operation: {str(e)}")
         finally:
-            await db.execute("ROLLBACK")
+            await db.execute("ROLLBACK TO dry_run")
+            await db.execute("RELEASE dry_run")
+
+
+# Recent read results, keyed by (db_path, whitespace-normalized SQL,
+# max_results). Agents re-issue the same lookups several times within one
+# conversation; the short TTL keeps externally-made edits from going stale
+# for long while mutations validated here are rolled back anyway.
+_QUERY_CACHE: OrderedDict[tuple[str, str, int], tuple[float, str]] = OrderedDict()
+_QUERY_CACHE_MAX = 128
+_QUERY_CACHE_TTL = 30.0
+
+
+def _normalize_query(sql: str) -> str:
+    # Collapse whitespace only; case is significant inside string literals.
+    return " ".join(sql.split())
+
+
+def _query_cache_get(key: tuple[str, str, int]) -> str | None:
+    entry = _QUERY_CACHE.get(key)
+    if entry is None:
+        return None
+    cached_at, result = entry
+    if time.monotonic() - cached_at > _QUERY_CACHE_TTL:
+        del _QUERY_CACHE[key]
+        return None
+    _QUERY_CACHE.move_to_end(key)
+    return result
+
+
+def _query_cache_put(key: tuple[str, str, int], result: str) -> None:
+    _QUERY_CACHE[key] = (time.monotonic(), result)
+    _QUERY_CACHE.move_to_end(key)
+    while len(_QUERY_CACHE) > _QUERY_CACHE_MAX:
+        _QUERY_CACHE.popitem(last=False)
 
 
 async def query_database(sql_query: str, db_path: str, max_results: int = MAX_QUERY_RESULTS) -> str:
     """
     Execute a SELECT query against the forms database.
-    
+
     Args:
         sql_query: A SELECT SQL query to execute
         db_path: Path to the SQLite database file
         max_results: Maximum number of rows to return (default: 1000)
-        
+
     Returns:
         JSON string containing query results
     """
     try:
         _validate_select_query(sql_query)
     except ValidationError as e:
-        return f"Validation error: {str(e)}"
-    
+        return _error(f"Validation error: {str(e)}")
+
+    cache_key = (db_path, _normalize_query(sql_query), max_results)
+    cached = _query_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        async with aiosqlite.connect(db_path) as db:
-            await db.execute("PRAGMA foreign_keys = OFF")
-            db.row_factory = aiosqlite.Row
+        async with _get_pool(db_path).acquire() as db:
+            # The row cap lives on the fetch side: rewriting the SQL into a
+            # "SELECT * FROM (...) LIMIT n" subquery broke queries ending in
+            # a -- line comment, where the wrapper landed inside the comment.
+            # fetchmany still stops SQLite stepping past max_results + 1 rows.
             async with db.execute(sql_query) as cursor:
                 rows = await cursor.fetchmany(max_results + 1)
-                truncated = len(rows) > max_results
-                
-                if truncated:
-                    rows = rows[:max_results]
-                
-                results = [dict(row) for row in rows]
-                
-                if truncated:
-                    return json.dumps({
-                        "results": results,
-                        "truncated": True,
-                        "message": f"Results limited to {max_results} rows. Refine your query for more specific results."
-                    }, indent=2)
-                
-                return json.dumps(results, indent=2)
+            truncated = len(rows) > max_results
+
+            if truncated:
+                rows = rows[:max_results]
+
+            # Capture the column names once instead of letting dict(row)
+            # re-derive them for every row.
+            if rows:
+                columns = rows[0].keys()
+                results = [dict(zip(columns, row)) for row in rows]
+            else:
+                results = []
+
+            if truncated:
+                response = _dumps({
+                    "results": results,
+                    "truncated": True,
+                    "message": f"Results limited to {max_results} rows. Refine your query for more specific results."
+                })
+            else:
+                response = _dumps(results)
+
+            _query_cache_put(cache_key, response)
+            return response
     except Exception as e:
-        return f"Error querying database: {str(e)}"
+        return _error(f"Error querying database: {str(e)}")
 
 
-async def create_record(table_name: str, record_data: str, db_path: str) -> str:
+async def create_record(table_name: str, record_data: str | dict, db_path: str) -> str:
     """
     Test creating a new record in the database within a transaction.
     The transaction is rolled back, so no actual changes are made.
-    
+
     Args:
         table_name: The name of the table to insert into
-        record_data: JSON string of column names to values for the new record
+        record_data: Column names to values for the new record, as a dict or
+            JSON string
         db_path: Path to the SQLite database file
-        
+
     Returns:
         JSON string containing the insert change plan
     """
     try:
         validate_table_name(table_name)
     except ValidationError as e:
-        return f"Validation error: {str(e)}"
-    
-    record_dict, error = await _validate_and_parse_json(record_data, "Error parsing record_data JSON")
-    if error:
-        return error
+        return _error(f"Validation error: {str(e)}")
+
+    if isinstance(record_data, dict):
+        record_dict = record_data
+    else:
+        record_dict, error = await _validate_and_parse_json(record_data, "Error parsing record_data JSON")
+        if error:
+            return _error(error)
     
     try:
         validate_columns(table_name, set(record_dict.keys()))
     except ValidationError as e:
-        return f"Validation error: {str(e)}"
+        return _error(f"Validation error: {str(e)}")
     
     async def perform_insert(db: aiosqlite.Connection) -> dict:
-        columns = list(record_dict.keys())
-        placeholders = ["?" for _ in columns]
-        values = [record_dict[col] for col in columns]
-        
-        insert_sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
-        await db.execute(insert_sql, values)
-        
-        return {"insert": [record_dict]}
-    
+        return await _apply_insert(db, table_name, record_dict)
+
     try:
         return await _execute_in_transaction(table_name, db_path, perform_insert)
     except Exception as e:
-        return f"Error connecting to database: {str(e)}"
+        return _error(f"Error connecting to database: {str(e)}")
 
 
-async def update_record(table_name: str, record_id: str, updates: str, db_path: str) -> str:
+async def update_record(table_name: str, record_id: str, updates: str | dict, db_path: str) -> str:
     """
     Test updating an existing record in the database within a transaction.
     The transaction is rolled back, so no actual changes are made.
-    
+
     Args:
         table_name: The name of the table to update
         record_id: The exact existing ID of the record to update
-        updates: JSON string of column names to new values
+        updates: Column names to new values, as a dict or JSON string
         db_path: Path to the SQLite database file
-        
+
     Returns:
         JSON string containing the update change plan
     """
     try:
         validate_table_name(table_name)
     except ValidationError as e:
-        return f"Validation error: {str(e)}"
-    
-    updates_dict, error = await _validate_and_parse_json(updates, "Error parsing updates JSON")
-    if error:
-        return error
+        return _error(f"Validation error: {str(e)}")
+
+    if isinstance(updates, dict):
+        updates_dict = updates
+    else:
+        updates_dict, error = await _validate_and_parse_json(updates, "Error parsing updates JSON")
+        if error:
+            return _error(error)
     
     try:
         validate_columns(table_name, set(updates_dict.keys()))
     except ValidationError as e:
-        return f"Validation error: {str(e)}"
+        return _error(f"Validation error: {str(e)}")
     
     async def perform_update(db: aiosqlite.Connection) -> dict:
-        check_sql = f"SELECT id FROM {table_name} WHERE id = ?"
-        async with db.execute(check_sql, (record_id,)) as cursor:
-            row = await cursor.fetchone()
-            if not row:
-                raise ValueError(f"Record with id '{record_id}' not found in table '{table_name}'")
-        
-        set_clauses = [f"{col} = ?" for col in updates_dict.keys()]
-        values = list(updates_dict.values())
-        values.append(record_id)
-        
-        update_sql = f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE id = ?"
-        await db.execute(update_sql, values)
-        
-        update_record = {"id": record_id, **updates_dict}
-        return {"update": [update_record]}
-    
+        return await _apply_update(db, table_name, record_id, updates_dict)
+
     try:
         return await _execute_in_transaction(table_name, db_path, perform_update)
     except Exception as e:
-        return f"Error connecting to database: {str(e)}"
+        return _error(f"Error connecting to database: {str(e)}")
 
 
 async def delete_record(table_name: str, record_id: str, db_path: str) -> str:
@@ -222,21 +439,95 @@ async def delete_record(table_name: str, record_id: str, db_path: str) -> str:
     try:
         validate_table_name(table_name)
     except ValidationError as e:
-        return f"Validation error: {str(e)}"
+        return _error(f"Validation error: {str(e)}")
     
     async def perform_delete(db: aiosqlite.Connection) -> dict:
-        check_sql = f"SELECT id FROM {table_name} WHERE id = ?"
-        async with db.execute(check_sql, (record_id,)) as cursor:
-            row = await cursor.fetchone()
-            if not row:
-                raise ValueError(f"Record with id '{record_id}' not found in table '{table_name}'")
-        
-        delete_sql = f"DELETE FROM {table_name} WHERE id = ?"
-        await db.execute(delete_sql, (record_id,))
-        
-        return {"delete": [{"id": record_id}]}
-    
+        return await _apply_delete(db, table_name, record_id)
+
     try:
         return await _execute_in_transaction(table_name, db_path, perform_delete)
     except Exception as e:
-        return f"Error connecting to database: {str(e)}"
+        return _error(f"Error connecting to database: {str(e)}")
+
+
+async def validate_changes(operations: str | list, db_path: str) -> str:
+    """
+    Test a batch of insert/update/delete operations within a single transaction.
+    The transaction is rolled back, so no actual changes are made.
+
+    Args:
+        operations: List of operations, as a list of dicts or a JSON string.
+            Each operation has an "action" ("insert", "update" or "delete"),
+            a "table_name", and either "data" (insert), or "record_id" plus
+            optional "updates" (update/delete)
+        db_path: Path to the SQLite database file
+
+    Returns:
+        JSON string containing the merged change plan keyed by table name
+    """
+    if isinstance(operations, list):
+        ops = operations
+    else:
+        ops, error = await _validate_and_parse_json(operations, "Error parsing operations JSON")
+        if error:
+            return _error(error)
+
+    if not isinstance(ops, list) or not ops:
+        return _error("Validation error: operations must be a non-empty list")
+
+    for index, op in enumerate(ops):
+        if not isinstance(op, dict):
+            return _error(f"Validation error: operation {index} must be an object")
+
+        action = op.get("action")
+        table_name = op.get("table_name")
+
+        if action not in ("insert", "update", "delete"):
+            return _error(f"Validation error: operation {index} has invalid action '{action}'")
+
+        try:
+            validate_table_name(table_name)
+            if action == "insert":
+                if not isinstance(op.get("data"), dict):
+                    return _error(f"Validation error: operation {index} (insert) requires a 'data' object")
+                validate_columns(table_name, set(op["data"].keys()))
+            else:
+                if not op.get("record_id"):
+                    return _error(f"Validation error: operation {index} ({action}) requires a 'record_id'")
+                if action == "update":
+                    if not isinstance(op.get("updates"), dict) or not op["updates"]:
+                        return _error(f"Validation error: operation {index} (update) requires a non-empty 'updates' object")
+                    validate_columns(table_name, set(op["updates"].keys()))
+        except ValidationError as e:
+            return _error(f"Validation error: operation {index}: {str(e)}")
+
+    async def perform_batch(db: aiosqlite.Connection) -> dict:
+        change_plan: dict[str, dict] = {}
+        for op in ops:
+            table_name = op["table_name"]
+            if op["action"] == "insert":
+                fragment = await _apply_insert(db, table_name, op["data"])
+            elif op["action"] == "update":
+                fragment = await _apply_update(db, table_name, op["record_id"], op["updates"])
+            else:
+                fragment = await _apply_delete(db, table_name, op["record_id"])
+
+            table_plan = change_plan.setdefault(table_name, {})
+            for change_type, records in fragment.items():
+                table_plan.setdefault(change_type, []).extend(records)
+        return change_plan
+
+    async with _get_pool(db_path).acquire() as db:
+        await db.execute("SAVEPOINT dry_run")
+        try:
+            change_plan = await perform_batch(db)
+            return _dumps(change_plan)
+        except aiosqlite.IntegrityError as e:
+            return _error(f"Integrity constraint violation: {str(e)}")
+        except ValueError as e:
+            return _error(f"Error: {str(e)}")
+        except Exception as e:
+            return _error(f"Error testing operations: {str(e)}")
+        finally:
+            await db.execute("ROLLBACK TO dry_run")
+            await db.execute("RELEASE dry_run")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any
+from typing import Dict, Any, Literal, Optional
 
 
 class RecordData(BaseModel):
@@ -16,3 +16,27 @@ class RecordUpdate(BaseModel):
         ...,
         description="Column names mapped to new values (only changed fields)"
     )
+
+
+class ChangeOperation(BaseModel):
+    """Model for a single operation in a bulk validation request."""
+    action: Literal["insert", "update", "delete"] = Field(
+        ...,
+        description="The type of database operation"
+    )
+    table_name: str = Field(
+        ...,
+        description="The name of the table the operation targets"
+    )
+    data: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Column names mapped to values for insert operations"
+    )
+    record_id: Optional[str] = Field(
+        default=None,
+        description="Existing record ID for update/delete operations"
+    )
+    updates: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Column names mapped to new values for update operations"
+    )
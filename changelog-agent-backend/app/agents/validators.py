@@ -1,4 +1,4 @@
-VALID_TABLES = {
+VALID_TABLES = frozenset({
     "categories",
     "forms",
     "form_pages",
@@ -10,48 +10,56 @@ VALID_TABLES = {
     "logic_rules",
     "logic_conditions",
     "logic_actions"
-}
+})
 
 TABLE_COLUMNS = {
-    "categories": {
+    "categories": frozenset({
         "id", "slug", "name", "description", "created_at", "updated_at"
-    },
-    "forms": {
+    }),
+    "forms": frozenset({
         "id", "org_id", "slug", "title", "description", "status",
         "category_id", "created_at", "updated_at"
-    },
-    "form_pages": {
+    }),
+    "form_pages": frozenset({
         "id", "form_id", "title", "description", "position",
         "created_at", "updated_at"
-    },
-    "field_types": {
+    }),
+    "field_types": frozenset({
         "id", "key", "has_options", "allows_multiple", "builtin_validators"
-    },
-    "form_fields": {
+    }),
+    "form_fields": frozenset({
         "id", "form_id", "page_id", "type_id", "code", "label",
         "help_text", "position", "required", "read_only", "placeholder",
         "default_value", "validation_schema", "visible_by_default",
         "created_at", "updated_at"
-    },
-    "option_sets": {
+    }),
+    "option_sets": frozenset({
         "id", "form_id", "name", "created_at", "updated_at"
-    },
-    "option_items": {
+    }),
+    "option_items": frozenset({
         "id", "option_set_id", "value", "label", "position", "is_active"
-    },
-    "field_option_binding": {
+    }),
+    "field_option_binding": frozenset({
         "field_id", "option_set_id", "display_pattern"
-    },
-    "logic_rules": {
+    }),
+    "logic_rules": frozenset({
         "id", "form_id", "name", "trigger", "scope", "priority", "enabled"
-    },
-    "logic_conditions": {
+    }),
+    "logic_conditions": frozenset({
         "id", "rule_id", "group_id", "lhs_ref", "operator", "rhs",
         "bool_join", "position"
-    },
-    "logic_actions": {
+    }),
+    "logic_actions": frozenset({
         "id", "rule_id", "action", "target_ref", "params", "position"
-    }
+    })
+}
+
+
+# Error messages enumerate the whitelists; sort and join them once at import
+# instead of on every failed validation.
+_ALLOWED_TABLES_MSG = ", ".join(sorted(VALID_TABLES))
+_ALLOWED_COLUMNS_MSG = {
+    table: ", ".join(sorted(columns)) for table, columns in TABLE_COLUMNS.items()
 }
 
 
@@ -63,7 +71,7 @@ def validate_table_name(table_name: str) -> None:
     if table_name not in VALID_TABLES:
         raise ValidationError(
             f"Invalid table name '{table_name}'. "
-            f"Allowed tables: {', '.join(sorted(VALID_TABLES))}"
+            f"Allowed tables: {_ALLOWED_TABLES_MSG}"
         )
 
 
@@ -88,5 +96,5 @@ def validate_columns(table_name: str, columns: set[str]) -> None:
     if invalid_columns:
         raise ValidationError(
             f"Invalid columns for table '{table_name}': {', '.join(sorted(invalid_columns))}. "
-            f"Allowed columns: {', '.join(sorted(allowed_columns))}"
+            f"Allowed columns: {_ALLOWED_COLUMNS_MSG[table_name]}"
         )
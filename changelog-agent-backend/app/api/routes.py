@@ -1,19 +1,30 @@
 from fastapi import APIRouter, HTTPException, Depends
-from functools import lru_cache
+import threading
 from app.models.schemas import (
-    ChatRequest, ChatResponse, TraceResponse, ToolCallsResponse, ToolCallData,
+    ChatRequest, ChatResponse, TraceResponse, ToolCallsResponse,
     CreateConversationResponse, ListConversationsResponse, ConversationMessagesResponse,
-    DeleteConversationResponse, ConversationMetadata, Message
+    DeleteConversationResponse
 )
 from app.services.agent_service import AgentService
 
 router = APIRouter()
 
 
-@lru_cache
+# AgentService construction registers a trace processor and opens the
+# sessions DB, so it must happen exactly once even if the first requests
+# arrive concurrently on several threads.
+_agent_service: AgentService | None = None
+_agent_service_lock = threading.Lock()
+
+
 def get_agent_service() -> AgentService:
     """Dependency injection for AgentService singleton."""
-    return AgentService()
+    global _agent_service
+    if _agent_service is None:
+        with _agent_service_lock:
+            if _agent_service is None:
+                _agent_service = AgentService()
+    return _agent_service
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -24,15 +35,12 @@ async def chat(
     """
     Chat with the agent. Session ID maintains conversation context.
     """
-    try:
-        response = await agent_service.chat(
-            user_message=request.message,
-            session_id=request.session_id
-        )
-        
-        return ChatResponse(response=response)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    response = await agent_service.chat(
+        user_message=request.message,
+        session_id=request.session_id
+    )
+
+    return ChatResponse.model_construct(response=response)
 
 
 @router.get("/health")
@@ -58,7 +66,7 @@ async def get_trace(
             detail=f"No trace found for session_id: {session_id}"
         )
     
-    return TraceResponse(
+    return TraceResponse.model_construct(
         session_id=session_id,
         trace_id=trace_id,
         trace_url=f"https://platform.openai.com/traces/trace?trace_id={trace_id}"
@@ -83,13 +91,12 @@ async def get_tool_calls_by_session(
         )
     
     tool_calls_data = agent_service.get_tool_calls_by_session(session_id)
-    tool_calls = [ToolCallData(**tc) for tc in tool_calls_data]
-    
+
     return ToolCallsResponse(
         session_id=session_id,
         trace_id=trace_id,
-        tool_calls=tool_calls,
-        total_count=len(tool_calls)
+        tool_calls=tool_calls_data,
+        total_count=len(tool_calls_data)
     )
 
 
@@ -110,13 +117,11 @@ async def get_tool_calls_by_trace(
             detail=f"No tool calls found for trace_id: {trace_id}"
         )
     
-    tool_calls = [ToolCallData(**tc) for tc in tool_calls_data]
-    
     return ToolCallsResponse(
         session_id=None,
         trace_id=trace_id,
-        tool_calls=tool_calls,
-        total_count=len(tool_calls)
+        tool_calls=tool_calls_data,
+        total_count=len(tool_calls_data)
     )
 
 
@@ -127,14 +132,11 @@ async def list_conversations(
     """
     List all conversations ordered by most recent activity.
     """
-    try:
-        conversations = agent_service.conversation_service.list_conversations()
-        return ListConversationsResponse(
-            conversations=[ConversationMetadata(**conv) for conv in conversations],
-            total_count=len(conversations)
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    conversations = agent_service.conversation_service.list_conversations()
+    return ListConversationsResponse(
+        conversations=conversations,
+        total_count=len(conversations)
+    )
 
 
 @router.post("/conversations", response_model=CreateConversationResponse)
@@ -144,20 +146,20 @@ async def create_conversation(
     """
     Create a new conversation. Returns session_id for use in chat endpoint.
     """
-    try:
-        result = agent_service.conversation_service.create_conversation()
-        return CreateConversationResponse(**result)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = agent_service.conversation_service.create_conversation()
+    return CreateConversationResponse.model_construct(**result)
 
 
 @router.get("/conversations/{session_id}/messages", response_model=ConversationMessagesResponse)
 async def get_conversation_messages(
     session_id: str,
+    limit: int = 100,
+    before: str | None = None,
     agent_service: AgentService = Depends(get_agent_service)
 ):
     """
-    Get all messages in a conversation.
+    Get messages in a conversation, newest page first.
+    Pass `before` (a message timestamp) to page further back.
     """
     conversation = agent_service.conversation_service.get_conversation(session_id)
     if not conversation:
@@ -165,16 +167,15 @@ async def get_conversation_messages(
             status_code=404,
             detail=f"Conversation not found: {session_id}"
         )
-    
-    try:
-        messages = agent_service.conversation_service.get_conversation_messages(session_id)
-        return ConversationMessagesResponse(
-            session_id=session_id,
-            messages=[Message(**msg) for msg in messages],
-            total_count=len(messages)
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+    messages = agent_service.conversation_service.get_conversation_messages(
+        session_id, limit=limit, before=before
+    )
+    return ConversationMessagesResponse(
+        session_id=session_id,
+        messages=messages,
+        total_count=len(messages)
+    )
 
 
 @router.delete("/conversations/{session_id}", response_model=DeleteConversationResponse)
@@ -185,15 +186,10 @@ async def delete_conversation(
     """
     Delete a conversation and all associated data.
     """
-    try:
-        success = agent_service.conversation_service.delete_conversation(session_id)
-        if not success:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Conversation not found: {session_id}"
-            )
-        return DeleteConversationResponse(success=True, session_id=session_id)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    success = agent_service.delete_conversation(session_id)
+    if not success:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Conversation not found: {session_id}"
+        )
+    return DeleteConversationResponse.model_construct(success=True, session_id=session_id)
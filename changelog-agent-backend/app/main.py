@@ -1,23 +1,58 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.routes import router
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+# Only read .env when the process environment is not already configured
+# (docker-compose injects ENVIRONMENT directly; local runs rely on the file).
+# Skipping the disk read also avoids re-parsing .env in every reloaded worker.
+if not os.getenv("ENVIRONMENT"):
+    load_dotenv()
 
+# No default_response_class override: ORJSONResponse is deprecated as of
+# FastAPI 0.141 (FastAPIDeprecationWarning on every instantiation, i.e. every
+# request, response_model or not) and FastAPI now serializes response models
+# directly to JSON bytes via Pydantic, which is already the fast path for the
+# routes here.
 app = FastAPI(
     title="Form Agent API",
     description="Chat with an AI agent that has access to form management database",
     version="1.0.0"
 )
 
+# Registered before (so it runs inside) CORSMiddleware: an app-level
+# Exception handler would live in the outermost ServerErrorMiddleware,
+# and its 500s would reach browsers without CORS headers.
+@app.middleware("http")
+async def unhandled_exception_middleware(request, call_next):
+    """Turn uncaught endpoint errors into a 500 response.
+
+    Replaces the identical try/except HTTPException(500) wrapper that every
+    route carried.
+    """
+    try:
+        return await call_next(request)
+    except Exception as exc:
+        return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+
+# Default to the local frontend dev servers; production sets CORS_ORIGINS.
+# Explicit origins/methods/headers keep the per-request CORS work to a simple
+# membership check instead of wildcard header generation (and '*' with
+# credentials is rejected by browsers anyway).
+cors_origins = os.getenv(
+    "CORS_ORIGINS",
+    "http://localhost:5173,http://localhost:3000"
+).split(",")
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Content-Type"],
 )
 
 app.include_router(router, prefix="/api/v1", tags=["chat"])
@@ -4,8 +4,19 @@ from app.agents.changelog_agent import form_agent
 from app.agents.context import FormContext
 from app.tracing.tool_call_processor import ToolCallProcessor
 from app.services.conversation_service import ConversationService
+import asyncio
 import os
-import json
+import orjson
+from collections import OrderedDict
+
+
+# Cap on cached SQLiteSession objects; least-recently-used sessions are
+# closed and evicted past this.
+_MAX_CACHED_SESSIONS = 256
+
+# Conversation titles are the first user message capped at this length,
+# with the last three characters traded for an ellipsis when truncated.
+_TITLE_MAX = 50
 
 
 class AgentService:
@@ -13,6 +24,9 @@ class AgentService:
         self.sessions_db = os.getenv("SESSIONS_DB", "/app/data/sessions.db")
         self.db_path = os.getenv("DATABASE_PATH", "/app/data/forms.sqlite")
         self.session_traces = {}
+        # Reuse session objects across turns instead of reopening the
+        # sessions DB handle on every chat call.
+        self._sessions: OrderedDict[str, SQLiteSession] = OrderedDict()
 
         self.tool_call_processor = ToolCallProcessor(self.sessions_db)
         add_trace_processor(self.tool_call_processor)
@@ -34,38 +48,62 @@ class AgentService:
         Returns:
             JSON string containing either clarification or changelog output
         """
-        session = SQLiteSession(session_id, self.sessions_db)
-
-        trace_id = self.conversation_service.get_trace_id(session_id)
-        if not trace_id:
-            trace_id = gen_trace_id()
-            self.session_traces[session_id] = trace_id
-
-        existing_conv = self.conversation_service.get_conversation(session_id)
-        if not existing_conv:
-            title = user_message[:50] if len(user_message) <= 50 else user_message[:47] + "..."
-            self.conversation_service.ensure_conversation_exists(session_id, title)
-            self.conversation_service.set_trace_id(session_id, trace_id)
+        session = self._get_session(session_id)
+
+        # The sync SQLite calls below would otherwise stall the event loop
+        # for every concurrent chat while they fsync; run them on threads.
+        trace_id = (
+            self.session_traces.get(session_id)
+            or await asyncio.to_thread(self.get_trace_id, session_id)
+            or gen_trace_id()
+        )
+
+        # One UPSERT covers what used to take up to four round trips
+        # (trace lookup, existence check, insert/update, trace write).
+        # It doesn't gate the LLM call, so let it run during the model
+        # round-trip and only surface its result (and any error) after.
+        if len(user_message) <= _TITLE_MAX:
+            title = user_message
         else:
-            self.conversation_service.update_conversation_metadata(session_id)
-            if not self.conversation_service.get_trace_id(session_id):
-                self.conversation_service.set_trace_id(session_id, trace_id)
+            title = f"{user_message[:_TITLE_MAX - 3]}..."
+        meta_task = asyncio.create_task(asyncio.to_thread(
+            self.conversation_service.touch_conversation, session_id, title, trace_id
+        ))
+        self.session_traces[session_id] = trace_id
 
         context = FormContext(db_path=self.db_path)
 
-        with trace(f"Conversation {session_id}", trace_id=trace_id):
-            result = await Runner.run(
-                starting_agent=form_agent,
-                input=user_message,
-                session=session,
-                context=context,
-                max_turns=50
-            )
+        try:
+            with trace(f"Conversation {session_id}", trace_id=trace_id):
+                result = await Runner.run(
+                    starting_agent=form_agent,
+                    input=user_message,
+                    session=session,
+                    context=context,
+                    max_turns=50
+                )
+        finally:
+            # The stored trace_id only differs from the local one if another
+            # request won a first-write race on a brand-new session.
+            self.session_traces[session_id] = await meta_task
 
         if hasattr(result.final_output, 'model_dump'):
-            return json.dumps(result.final_output.model_dump())
+            return orjson.dumps(result.final_output.model_dump()).decode("utf-8")
         return result.final_output
 
+    def _get_session(self, session_id: str) -> SQLiteSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = SQLiteSession(session_id, self.sessions_db)
+            self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > _MAX_CACHED_SESSIONS:
+            _, evicted = self._sessions.popitem(last=False)
+            close = getattr(evicted, "close", None)
+            if close:
+                close()
+        return session
+
     def get_trace_id(self, session_id: str) -> str | None:
         """
         Get the trace_id for a given session.
@@ -76,10 +114,36 @@ class AgentService:
         Returns:
             The trace_id if it exists, None otherwise
         """
+        # A session's trace_id never changes once assigned, so the in-memory
+        # map can satisfy repeat lookups without touching the sessions DB.
+        trace_id = self.session_traces.get(session_id)
+        if trace_id:
+            return trace_id
+
         trace_id = self.conversation_service.get_trace_id(session_id)
         if trace_id:
             self.session_traces[session_id] = trace_id
-        return trace_id or self.session_traces.get(session_id)
+        return trace_id
+
+    def delete_conversation(self, session_id: str) -> bool:
+        """
+        Delete a conversation and drop its cached trace_id.
+
+        Args:
+            session_id: Unique identifier for the conversation session
+
+        Returns:
+            True if the conversation existed and was deleted
+        """
+        deleted = self.conversation_service.delete_conversation(session_id)
+        if deleted:
+            self.session_traces.pop(session_id, None)
+            cached = self._sessions.pop(session_id, None)
+            if cached is not None:
+                close = getattr(cached, "close", None)
+                if close:
+                    close()
+        return deleted
 
     def get_tool_calls_by_session(self, session_id: str) -> list[dict]:
         """
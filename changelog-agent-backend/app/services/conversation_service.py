@@ -1,47 +1,158 @@
 import sqlite3
+import threading
 import uuid
-import json
-from datetime import datetime
+import orjson
+from datetime import datetime, timezone
 from typing import Optional
 from agents import SQLiteSession
 
 
+_UTC = timezone.utc
+
+
+def _now_iso() -> str:
+    """UTC timestamp in the ISO-with-Z format the tables already store."""
+    return datetime.now(_UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+# SQL is defined once at module level so each call passes the same string
+# object to SQLite, keeping statement-cache lookups cheap.
+_CREATE_CONVERSATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS conversations (
+        session_id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        message_count INTEGER DEFAULT 0,
+        trace_id TEXT
+    )
+"""
+
+_INSERT_CONVERSATION_SQL = """
+    INSERT INTO conversations (session_id, title, created_at, updated_at, message_count)
+    VALUES (?, ?, ?, ?, 0)
+"""
+
+_TOUCH_CONVERSATION_SQL = """
+    INSERT INTO conversations (session_id, title, created_at, updated_at, message_count, trace_id)
+    VALUES (?, ?, ?, ?, 0, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        updated_at = excluded.updated_at,
+        message_count = conversations.message_count + 1,
+        trace_id = COALESCE(conversations.trace_id, excluded.trace_id)
+    RETURNING trace_id
+"""
+
+# Column order of the two conversation SELECTs; zipping against it skips
+# sqlite3.Row's per-field name lookups.
+_CONVERSATION_COLUMNS = ("session_id", "title", "created_at", "updated_at", "message_count")
+
+_LIST_CONVERSATIONS_SQL = """
+    SELECT session_id, title, created_at, updated_at, message_count
+    FROM conversations
+    ORDER BY updated_at DESC
+"""
+
+_GET_CONVERSATION_SQL = """
+    SELECT session_id, title, created_at, updated_at, message_count
+    FROM conversations
+    WHERE session_id = ?
+"""
+
+_UPDATE_METADATA_TITLE_SQL = """
+    UPDATE conversations
+    SET updated_at = ?, title = ?, message_count = message_count + 1
+    WHERE session_id = ?
+"""
+
+_UPDATE_METADATA_SQL = """
+    UPDATE conversations
+    SET updated_at = ?, message_count = message_count + 1
+    WHERE session_id = ?
+"""
+
+_DELETE_CONVERSATION_SQL = "DELETE FROM conversations WHERE session_id = ?"
+
+# Newest-first with a LIMIT so the initial load is a bounded index range
+# scan; callers get ascending order back after the Python-side reverse.
+_GET_MESSAGES_TAIL_SQL = """
+    SELECT message_data, created_at
+    FROM agent_messages
+    WHERE session_id = ?
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+_GET_MESSAGES_BEFORE_SQL = """
+    SELECT message_data, created_at
+    FROM agent_messages
+    WHERE session_id = ? AND created_at < ?
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+_CREATE_MESSAGES_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_agent_messages_sid_ts
+    ON agent_messages(session_id, created_at)
+"""
+
+_SET_TRACE_ID_SQL = """
+    UPDATE conversations
+    SET trace_id = ?
+    WHERE session_id = ?
+"""
+
+_GET_TRACE_ID_SQL = """
+    SELECT trace_id
+    FROM conversations
+    WHERE session_id = ?
+"""
+
+
+
 class ConversationService:
     def __init__(self, sessions_db: str):
         self.sessions_db = sessions_db
+        # One long-lived connection guarded by a lock: metadata statements are
+        # tiny, so per-call connect/teardown dominated their cost.
+        self._conn = sqlite3.connect(self.sessions_db, check_same_thread=False)
+        # WAL lets readers proceed during the frequent small metadata writes,
+        # and NORMAL drops the per-commit fsync WAL makes redundant.
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._lock = threading.Lock()
         self._init_metadata_table()
-    
+
     def _init_metadata_table(self):
-        with sqlite3.connect(self.sessions_db) as conn:
+        with self._lock:
+            conn = self._conn
             cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS conversations (
-                    session_id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    message_count INTEGER DEFAULT 0,
-                    trace_id TEXT
-                )
-            """)
-            
-            cursor.execute("PRAGMA table_info(conversations)")
-            columns = [row[1] for row in cursor.fetchall()]
-            if 'trace_id' not in columns:
+            cursor.execute(_CREATE_CONVERSATIONS_TABLE_SQL)
+
+            # New databases get trace_id from the CREATE TABLE; for ones made
+            # before the column existed, the ALTER fails harmlessly otherwise.
+            try:
                 cursor.execute("ALTER TABLE conversations ADD COLUMN trace_id TEXT")
-            
+            except sqlite3.OperationalError:
+                pass
+
+            # agent_messages belongs to the SDK's SQLiteSession and may not
+            # exist yet on a fresh database; skip the index until it does.
+            try:
+                cursor.execute(_CREATE_MESSAGES_INDEX_SQL)
+            except sqlite3.OperationalError:
+                pass
+
             conn.commit()
     
     def create_conversation(self, title: str = "New Conversation") -> dict:
         session_id = str(uuid.uuid4())
-        created_at = datetime.utcnow().isoformat() + "Z"
+        created_at = _now_iso()
         
-        with sqlite3.connect(self.sessions_db) as conn:
+        with self._lock:
+            conn = self._conn
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO conversations (session_id, title, created_at, updated_at, message_count)
-                VALUES (?, ?, ?, ?, 0)
-            """, (session_id, title, created_at, created_at))
+            cursor.execute(_INSERT_CONVERSATION_SQL, (session_id, title, created_at, created_at))
             conn.commit()
         
         return {
@@ -51,68 +162,69 @@ class ConversationService:
         }
     
     def list_conversations(self) -> list[dict]:
-        with sqlite3.connect(self.sessions_db) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT session_id, title, created_at, updated_at, message_count
-                FROM conversations
-                ORDER BY updated_at DESC
-            """)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(_LIST_CONVERSATIONS_SQL)
             rows = cursor.fetchall()
-        
-        return [dict(row) for row in rows]
-    
+
+        return [dict(zip(_CONVERSATION_COLUMNS, row)) for row in rows]
+
     def get_conversation(self, session_id: str) -> Optional[dict]:
-        with sqlite3.connect(self.sessions_db) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT session_id, title, created_at, updated_at, message_count
-                FROM conversations
-                WHERE session_id = ?
-            """, (session_id,))
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(_GET_CONVERSATION_SQL, (session_id,))
             row = cursor.fetchone()
-        
-        return dict(row) if row else None
+
+        return dict(zip(_CONVERSATION_COLUMNS, row)) if row else None
     
     def update_conversation_metadata(self, session_id: str, title: Optional[str] = None):
-        updated_at = datetime.utcnow().isoformat() + "Z"
+        updated_at = _now_iso()
         
-        with sqlite3.connect(self.sessions_db) as conn:
+        with self._lock:
+            conn = self._conn
             cursor = conn.cursor()
             
             if title:
-                cursor.execute("""
-                    UPDATE conversations
-                    SET updated_at = ?, title = ?, message_count = message_count + 1
-                    WHERE session_id = ?
-                """, (updated_at, title, session_id))
+                cursor.execute(_UPDATE_METADATA_TITLE_SQL, (updated_at, title, session_id))
             else:
-                cursor.execute("""
-                    UPDATE conversations
-                    SET updated_at = ?, message_count = message_count + 1
-                    WHERE session_id = ?
-                """, (updated_at, session_id))
+                cursor.execute(_UPDATE_METADATA_SQL, (updated_at, session_id))
             
             conn.commit()
     
+    def touch_conversation(self, session_id: str, title: str, trace_id: str) -> str:
+        """
+        Create-or-update a conversation's metadata in one statement.
+
+        Inserts the conversation with the given title and trace_id if it does
+        not exist; otherwise bumps updated_at and message_count and keeps the
+        first trace_id ever assigned. Returns the stored trace_id.
+        """
+        now = _now_iso()
+
+        with self._lock:
+            conn = self._conn
+            cursor = conn.cursor()
+            cursor.execute(_TOUCH_CONVERSATION_SQL, (session_id, title, now, now, trace_id))
+            row = cursor.fetchone()
+            conn.commit()
+
+        return row[0]
+
     def ensure_conversation_exists(self, session_id: str, title: str = "New Conversation"):
         existing = self.get_conversation(session_id)
         if not existing:
-            created_at = datetime.utcnow().isoformat() + "Z"
-            with sqlite3.connect(self.sessions_db) as conn:
+            created_at = _now_iso()
+            with self._lock:
+                conn = self._conn
                 cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO conversations (session_id, title, created_at, updated_at, message_count)
-                    VALUES (?, ?, ?, ?, 0)
-                """, (session_id, title, created_at, created_at))
+                cursor.execute(_INSERT_CONVERSATION_SQL, (session_id, title, created_at, created_at))
                 conn.commit()
     
     def delete_conversation(self, session_id: str) -> bool:
-        with sqlite3.connect(self.sessions_db) as conn:
+        with self._lock:
+            conn = self._conn
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM conversations WHERE session_id = ?", (session_id,))
+            cursor.execute(_DELETE_CONVERSATION_SQL, (session_id,))
             deleted = cursor.rowcount > 0
             conn.commit()
         
@@ -125,73 +237,77 @@ class ConversationService:
         
         return deleted
     
-    def get_conversation_messages(self, session_id: str) -> list[dict]:
+    def get_conversation_messages(
+        self,
+        session_id: str,
+        limit: int = 100,
+        before: Optional[str] = None,
+    ) -> list[dict]:
         try:
-            with sqlite3.connect(self.sessions_db) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT message_data, created_at
-                    FROM agent_messages
-                    WHERE session_id = ?
-                    ORDER BY created_at ASC
-                """, (session_id,))
-                rows = cursor.fetchall()
-            
             messages = []
-            for row in rows:
-                try:
-                    data = json.loads(row['message_data'])
-                    
-                    if 'role' in data and data['role'] in ['user', 'assistant']:
-                        content = data.get('content', '')
-                        
-                        if data['role'] == 'assistant':
-                            if isinstance(content, list) and len(content) > 0:
-                                if isinstance(content[0], dict) and 'text' in content[0]:
-                                    content = content[0]['text']
-                            elif isinstance(content, str):
+            # Bind the hot-loop type check once; with orjson parsing, per-row
+            # cost is dominated by these checks for a long conversation.
+            _str = str
+            fallback_timestamp = _now_iso()
+
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.arraysize = 200
+                if before is None:
+                    cursor.execute(_GET_MESSAGES_TAIL_SQL, (session_id, limit))
+                else:
+                    cursor.execute(_GET_MESSAGES_BEFORE_SQL, (session_id, before, limit))
+
+                for message_data, created_at in cursor:
+                    try:
+                        data = orjson.loads(message_data)
+                    except orjson.JSONDecodeError:
+                        continue
+
+                    role = data.get('role')
+                    if role not in ('user', 'assistant'):
+                        continue
+
+                    content = data.get('content', '')
+
+                    if role == 'assistant':
+                        # EAFP: the common shape is [{'text': ...}]; anything
+                        # else raises and falls through to the string case.
+                        try:
+                            content = content[0]['text']
+                        except (TypeError, KeyError, IndexError):
+                            if type(content) is _str:
                                 try:
-                                    content_list = json.loads(content)
-                                    if isinstance(content_list, list) and len(content_list) > 0:
-                                        if 'text' in content_list[0]:
-                                            content = content_list[0]['text']
-                                except (json.JSONDecodeError, KeyError, IndexError):
+                                    content = orjson.loads(content)[0]['text']
+                                except (orjson.JSONDecodeError, TypeError, KeyError, IndexError):
                                     pass
-                        
-                        if not isinstance(content, str):
-                            content = json.dumps(content)
-                        
-                        messages.append({
-                            "role": data['role'],
-                            "content": content,
-                            "timestamp": row['created_at'] if row['created_at'] else datetime.utcnow().isoformat() + "Z"
-                        })
-                except json.JSONDecodeError:
-                    continue
-            
+
+                    if type(content) is not _str:
+                        content = orjson.dumps(content).decode("utf-8")
+
+                    messages.append({
+                        "role": role,
+                        "content": content,
+                        "timestamp": created_at if created_at else fallback_timestamp
+                    })
+
+            messages.reverse()
             return messages
         except Exception:
             return []
     
     def set_trace_id(self, session_id: str, trace_id: str):
-        with sqlite3.connect(self.sessions_db) as conn:
+        with self._lock:
+            conn = self._conn
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE conversations
-                SET trace_id = ?
-                WHERE session_id = ?
-            """, (trace_id, session_id))
+            cursor.execute(_SET_TRACE_ID_SQL, (trace_id, session_id))
             conn.commit()
     
     def get_trace_id(self, session_id: str) -> Optional[str]:
-        with sqlite3.connect(self.sessions_db) as conn:
+        with self._lock:
+            conn = self._conn
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT trace_id
-                FROM conversations
-                WHERE session_id = ?
-            """, (session_id,))
+            cursor.execute(_GET_TRACE_ID_SQL, (session_id,))
             row = cursor.fetchone()
         
         return row[0] if row and row[0] else None
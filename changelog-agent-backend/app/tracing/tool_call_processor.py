@@ -1,18 +1,215 @@
 from agents.tracing import TracingProcessor, Span, Trace, FunctionSpanData
-from typing import Any, Optional
-from collections import defaultdict
-from datetime import datetime
+from typing import Any, Iterator, Optional
+from collections import OrderedDict, deque, namedtuple
+from datetime import datetime, timezone
 import sqlite3
-import json
+import threading
+import queue
+import logging
+import zlib
+import atexit
+import orjson
+
+
+logger = logging.getLogger(__name__)
+
+
+_UTC = timezone.utc
+
+
+def _now_iso() -> str:
+    """UTC timestamp in the ISO-with-Z format the tool_calls table stores."""
+    return datetime.now(_UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+# Column order of the SELECT in get_tool_calls; zipping against it avoids
+# paying for sqlite3.Row's name lookups on every row.
+_TOOL_CALL_COLUMNS = (
+    "trace_id", "span_id", "tool_name", "input", "output",
+    "started_at", "ended_at", "error"
+)
+
+# Per-span record: cheaper to allocate and roughly half the size of the
+# 8-key dict it replaces; field order matches the INSERT and SELECT above.
+ToolCallRecord = namedtuple("ToolCallRecord", _TOOL_CALL_COLUMNS)
+
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    """Tune a sessions-DB connection: WAL halves the fsyncs per commit and
+    lets readers proceed during writes (journal_mode persists on disk, but
+    re-running it is cheap); busy_timeout covers writer/reader overlap."""
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA busy_timeout = 5000")
+
+
+# Inputs at or above this size are stored zlib-compressed in input_blob;
+# below it the compression framing outweighs the savings.
+_COMPRESS_MIN_BYTES = 256
+
+
+def _pack_input(value: Any) -> tuple[Optional[str], Optional[bytes]]:
+    """Split a span input into (text, blob) for storage.
+
+    Large inputs (long SQL, big JSON args) dominate tool_calls row size,
+    so they go compressed into the blob column; small ones stay as TEXT.
+    """
+    if value is None:
+        return None, None
+    if type(value) is not str:
+        value = str(value)
+    raw = value.encode("utf-8")
+    if len(raw) < _COMPRESS_MIN_BYTES:
+        return value, None
+    return None, zlib.compress(raw, 6)
+
+
+def _stringify_output(output: Any) -> Optional[str]:
+    """Render a span output the way the table stores it (falsy -> NULL).
+
+    Non-string outputs are serialized with orjson (C-level, compact JSON)
+    off the tracing hot path; str() covers anything JSON can't represent.
+    """
+    if not output:
+        return None
+    if type(output) is str:
+        return output
+    try:
+        return orjson.dumps(output).decode("utf-8")
+    except TypeError:
+        return str(output)
+
+
+# Caps on the in-memory store: oldest-touched traces are evicted first, and
+# within a trace only the newest spans are kept, so one abusive trace can't
+# blow the heap either. Spans persisted to the sessions DB are unaffected.
+_MAX_TRACES = 1024
+_MAX_CALLS_PER_TRACE = 512
+
+
+class _SpanWriter:
+    """Single writer thread per sessions DB, shared by all processors.
+
+    Every producer enqueues; one daemon thread owns the write connection
+    and coalesces up to _MAX_BATCH spans per transaction, so concurrent
+    processors never compete for the file write lock.
+    """
+
+    _MAX_BATCH = 32
+
+    def __init__(self, sessions_db: str):
+        self.sessions_db = sessions_db
+        self._queue: queue.Queue = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, record: "ToolCallRecord") -> bool:
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+    def drain(self):
+        """Block until everything enqueued so far has been written."""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def _loop(self):
+        # A generous statement cache plus one long-lived cursor keeps the
+        # prepared INSERT hot across batches instead of re-preparing it.
+        conn = sqlite3.connect(self.sessions_db, cached_statements=256)
+        _apply_pragmas(conn)
+        # Checkpoint the WAL roughly every 1000 pages rather than letting it
+        # grow until a reader forces a large (stalling) checkpoint.
+        conn.execute("PRAGMA wal_autocheckpoint = 1000")
+        cursor = conn.cursor()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            batch = [item]
+            while len(batch) < self._MAX_BATCH:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    self._queue.task_done()
+                    self._write_batch(cursor, batch)
+                    for _ in batch:
+                        self._queue.task_done()
+                    conn.close()
+                    return
+                batch.append(extra)
+            self._write_batch(cursor, batch)
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
+
+    def _write_batch(self, cursor, batch: list[tuple]):
+        # One timestamp per batch; created_at records persistence time, not
+        # span end (started_at/ended_at carry the span timing).
+        created_at = _now_iso()
+        try:
+            cursor.executemany("""
+                INSERT INTO tool_calls
+                (trace_id, span_id, tool_name, input, input_blob, output, started_at, ended_at, error, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                row[:3] + _pack_input(row[3]) + (_stringify_output(row[4]),) + row[5:] + (created_at,)
+                for row in batch
+            ])
+            cursor.connection.commit()
+        except sqlite3.Error:
+            # busy_timeout already makes SQLite wait out lock contention, so
+            # a failure here is worth surfacing rather than retrying blind.
+            logger.warning("Failed to persist %d tool-call span(s)", len(batch), exc_info=True)
+
+
+_WRITERS: dict[str, _SpanWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def _get_writer(sessions_db: str) -> _SpanWriter:
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(sessions_db)
+        if writer is None:
+            writer = _WRITERS[sessions_db] = _SpanWriter(sessions_db)
+        return writer
+
 
 
 class ToolCallProcessor(TracingProcessor):
     def __init__(self, sessions_db: Optional[str] = None):
-        self.tool_calls_by_trace = defaultdict(list)
+        # Span callbacks arrive on tracing threads while request threads
+        # read, so the store is lock-guarded and LRU-bounded.
+        self.tool_calls_by_trace: OrderedDict[str, deque] = OrderedDict()
+        self._store_lock = threading.Lock()
         self.sessions_db = sessions_db
+        self._persist_enabled = bool(sessions_db)
         if self.sessions_db:
             self._init_tool_calls_table()
-        
+            # Persistence funnels through the per-database shared writer so
+            # sibling processors coalesce into the same batches.
+            self._writer = _get_writer(self.sessions_db)
+            # Read-only connection: under WAL it reads a consistent snapshot
+            # while the writer commits, so neither side ever blocks the other
+            # (and a stray write here fails loudly instead of contending).
+            self._read_conn = sqlite3.connect(
+                f"file:{self.sessions_db}?mode=ro", uri=True,
+                check_same_thread=False, cached_statements=256,
+            )
+            self._read_conn.execute("PRAGMA busy_timeout = 5000")
+            self._read_lock = threading.Lock()
+
     def _init_tool_calls_table(self):
         with sqlite3.connect(self.sessions_db) as conn:
             cursor = conn.cursor()
@@ -30,97 +227,131 @@ class ToolCallProcessor(TracingProcessor):
                     created_at TEXT NOT NULL
                 )
             """)
+            # Older databases predate the compressed-input column.
+            try:
+                cursor.execute("ALTER TABLE tool_calls ADD COLUMN input_blob BLOB")
+            except sqlite3.OperationalError:
+                pass
+            # (trace_id, id) matches get_tool_calls' WHERE + ORDER BY, so the
+            # lookup is a single ordered index range scan with no sort step.
+            cursor.execute("DROP INDEX IF EXISTS idx_tool_calls_trace_id")
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_tool_calls_trace_id 
-                ON tool_calls(trace_id)
+                CREATE INDEX IF NOT EXISTS idx_tool_calls_trace_id_id
+                ON tool_calls(trace_id, id)
             """)
             conn.commit()
     
-    def _persist_tool_call(self, tool_call_data: dict):
-        if not self.sessions_db:
-            return
-        
-        try:
-            with sqlite3.connect(self.sessions_db) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO tool_calls 
-                    (trace_id, span_id, tool_name, input, output, started_at, ended_at, error, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    tool_call_data["trace_id"],
-                    tool_call_data["span_id"],
-                    tool_call_data["tool_name"],
-                    tool_call_data["input"],
-                    tool_call_data["output"],
-                    tool_call_data["started_at"],
-                    tool_call_data["ended_at"],
-                    tool_call_data["error"],
-                    datetime.utcnow().isoformat() + "Z"
-                ))
-                conn.commit()
-        except Exception:
-            pass
-    
+    def _persist_tool_call(self, record: ToolCallRecord):
+        # The in-memory store still holds the span; only persistence is
+        # shed if the writer's queue is saturated.
+        self._writer.submit(record)
+
+    def _drain_queue(self):
+        """Block until everything enqueued so far has been written."""
+        if self.sessions_db:
+            self._writer.drain()
+
     def on_trace_start(self, trace: Trace) -> None:
         pass
-    
+
     def on_trace_end(self, trace: Trace) -> None:
         pass
-    
+
     def on_span_start(self, span: Span[Any]) -> None:
         pass
     
     def on_span_end(self, span: Span[Any]) -> None:
         if isinstance(span.span_data, FunctionSpanData):
-            tool_call_data = {
-                "span_id": span.span_id,
-                "trace_id": span.trace_id,
-                "tool_name": span.span_data.name,
-                "input": span.span_data.input,
-                "output": str(span.span_data.output) if span.span_data.output else None,
-                "started_at": span.started_at,
-                "ended_at": span.ended_at,
-                "error": span.error if span.error else None,
-            }
-            self.tool_calls_by_trace[span.trace_id].append(tool_call_data)
-            self._persist_tool_call(tool_call_data)
+            record = ToolCallRecord(
+                trace_id=span.trace_id,
+                span_id=span.span_id,
+                tool_name=span.span_data.name,
+                input=span.span_data.input,
+                # Kept raw here; stringifying a large tool output would block
+                # the tracing thread, so it happens at write/read time.
+                output=span.span_data.output,
+                started_at=span.started_at,
+                ended_at=span.ended_at,
+                error=span.error if span.error else None,
+            )
+            with self._store_lock:
+                calls = self.tool_calls_by_trace.get(span.trace_id)
+                if calls is None:
+                    calls = self.tool_calls_by_trace[span.trace_id] = deque(
+                        maxlen=_MAX_CALLS_PER_TRACE
+                    )
+                calls.append(record)
+                self.tool_calls_by_trace.move_to_end(span.trace_id)
+                while len(self.tool_calls_by_trace) > _MAX_TRACES:
+                    self.tool_calls_by_trace.popitem(last=False)
+            if self._persist_enabled:
+                self._persist_tool_call(record)
     
     def shutdown(self) -> None:
-        pass
-    
+        if self.sessions_db:
+            # The shared writer may serve other processors; just flush our
+            # backlog and let its atexit hook close it.
+            self._drain_queue()
+            self._read_conn.close()
+
     def force_flush(self) -> None:
-        pass
-    
-    def get_tool_calls(self, trace_id: str) -> list[dict[str, Any]]:
+        self._drain_queue()
+
+    def iter_tool_calls(self, trace_id: str) -> Iterator[dict[str, Any]]:
+        """Yield a trace's tool calls oldest-first without materializing
+        them all; rows come off the read connection in fetchmany chunks.
+
+        Each iteration gets its own cursor (prepared statements are cached
+        per connection, so this stays cheap) so concurrent readers don't
+        clobber each other's result sets.
+        """
         if self.sessions_db:
+            self._drain_queue()
             try:
-                with sqlite3.connect(self.sessions_db) as conn:
-                    conn.row_factory = sqlite3.Row
-                    cursor = conn.cursor()
+                cursor = self._read_conn.cursor()
+                cursor.arraysize = 256
+                with self._read_lock:
                     cursor.execute("""
-                        SELECT trace_id, span_id, tool_name, input, output, 
-                               started_at, ended_at, error
+                        SELECT trace_id, span_id, tool_name, input, output,
+                               started_at, ended_at, error, input_blob
                         FROM tool_calls
                         WHERE trace_id = ?
                         ORDER BY id ASC
                     """, (trace_id,))
-                    rows = cursor.fetchall()
-                    return [dict(row) for row in rows]
-            except Exception:
-                pass
+                while True:
+                    with self._read_lock:
+                        rows = cursor.fetchmany()
+                    if not rows:
+                        return
+                    for row in rows:
+                        call = dict(zip(_TOOL_CALL_COLUMNS, row))
+                        if row[8] is not None:
+                            call["input"] = zlib.decompress(row[8]).decode("utf-8")
+                        yield call
+            except sqlite3.Error:
+                logger.warning("Failed to read tool calls for trace %s; "
+                               "falling back to in-memory store", trace_id, exc_info=True)
         
-        return self.tool_calls_by_trace.get(trace_id, [])
-    
+        with self._store_lock:
+            stored = list(self.tool_calls_by_trace.get(trace_id, ()))
+        for record in stored:
+            yield dict(record._asdict(), output=_stringify_output(record.output))
+
+    def get_tool_calls(self, trace_id: str) -> list[dict[str, Any]]:
+        return list(self.iter_tool_calls(trace_id))
+
     def clear_trace(self, trace_id: str) -> None:
-        if trace_id in self.tool_calls_by_trace:
-            del self.tool_calls_by_trace[trace_id]
+        with self._store_lock:
+            self.tool_calls_by_trace.pop(trace_id, None)
         
         if self.sessions_db:
+            # Deletes only happen when a conversation is removed, so a
+            # short-lived write connection is fine; the long-lived read
+            # connection stays read-only.
             try:
                 with sqlite3.connect(self.sessions_db) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM tool_calls WHERE trace_id = ?", (trace_id,))
+                    _apply_pragmas(conn)
+                    conn.execute("DELETE FROM tool_calls WHERE trace_id = ?", (trace_id,))
                     conn.commit()
-            except Exception:
-                pass
+            except sqlite3.Error:
+                logger.warning("Failed to clear tool calls for trace %s", trace_id, exc_info=True)
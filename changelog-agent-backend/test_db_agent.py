@@ -2,15 +2,13 @@
 """Test script to verify agent can query database"""
 
 import asyncio
-import sys
-import os
 
-# Add app to path
-sys.path.insert(0, '/app')
-
-from app.agents.changelog_agent import query_forms_database
 
 async def main():
+    # Imported here so pytest collection doesn't pay for (or double-register)
+    # the agent module; this script is meant to be run directly.
+    from app.agents.changelog_agent import query_forms_database
+
     print("Testing agent's database query tool...\n")
     
     # Test 1: List all forms
@@ -0,0 +1,105 @@
+"""Shared fixtures for the test suite."""
+import os
+import sqlite3
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+
+
+TEST_DB_PATH = "data/forms.sqlite"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--base-url",
+        default="http://localhost:8000",
+        help="Backend address the integration tests talk to",
+    )
+    parser.addoption(
+        "--run-integration",
+        action="store_true",
+        help="Run tests marked integration (they need a live backend)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip integration tests unless explicitly requested.
+
+    They block on a live server and LLM round-trips, so the default pytest
+    invocation stays fast; CI opts in with --run-integration or
+    RUN_INTEGRATION=1.
+    """
+    if config.getoption("--run-integration") or os.getenv("RUN_INTEGRATION") == "1":
+        return
+    skip = pytest.mark.skip(reason="need --run-integration to run")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip)
+
+# Shared-cache URI: every connection that opens it (helpers and the tool
+# functions under test) sees the same in-memory database.
+TEST_DB_URI = "file:test-forms-db?mode=memory&cache=shared"
+
+
+@pytest.fixture(scope="session")
+def test_db():
+    """In-memory copy of the forms database, populated once per session.
+
+    The CRUD tests only verify change-plan structure and that the data is
+    untouched afterwards, so they can run against a snapshot and skip file
+    I/O entirely. The keeper connection holds the shared-cache database
+    alive for the whole session.
+    """
+    keeper = sqlite3.connect(TEST_DB_URI, uri=True)
+    src = sqlite3.connect(TEST_DB_PATH)
+    src.backup(keeper)
+    src.close()
+    yield TEST_DB_URI
+    keeper.close()
+
+
+@pytest.fixture(scope="session")
+def sync_db(test_db):
+    """Synchronous counterpart of db for helpers outside the code under test.
+
+    Seed lookups and count checks don't exercise async paths, so going
+    through aiosqlite's worker thread just adds an event-loop hop per call.
+    """
+    # isolation_level=None skips the implicit BEGIN wrapping; the helpers
+    # only run single SELECTs. WAL/mmap would also help here but are no-ops
+    # for an in-memory database.
+    conn = sqlite3.connect(
+        test_db, uri=True, check_same_thread=False,
+        cached_statements=256, isolation_level=None,
+    )
+    conn.executescript(
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-64000;"
+        "PRAGMA foreign_keys=ON;"
+    )
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def db(test_db):
+    """One warm aiosqlite connection shared by every test in the session.
+
+    The read helpers used to reopen the database file per call; a single
+    tuned connection keeps SQLite's page cache hot across the whole run.
+    """
+    # cached_statements keeps the helpers' fixed query strings prepared
+    # across calls instead of re-parsing them each time.
+    conn = await aiosqlite.connect(
+        test_db, uri=True, cached_statements=256, isolation_level=None
+    )
+    await conn.executescript(
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-64000;"
+        "PRAGMA foreign_keys=ON;"
+    )
+    conn.row_factory = aiosqlite.Row
+    yield conn
+    await conn.close()
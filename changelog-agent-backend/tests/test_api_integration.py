@@ -1,23 +1,43 @@
 import pytest
-import json
+import orjson
 import httpx
-import time
 from typing import Dict, Any
 
 
 BASE_URL = "http://localhost:8000"
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
-    """Create an HTTP client for testing."""
-    return httpx.Client(base_url=BASE_URL, timeout=300.0)
+    """One HTTP client for the whole module so tests reuse its connection pool."""
+    client = httpx.Client(
+        base_url=BASE_URL,
+        timeout=300.0,
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60),
+    )
+    yield client
+    client.close()
 
 
-def assert_changelog_response(response_data: Dict[str, Any], expected_tables: list[str]):
-    """Helper to validate changelog response structure."""
-    response_json = json.loads(response_data["response"])
-    
+@pytest.fixture(scope="module")
+def shared_session_id(client):
+    """One conversation shared by tests that don't depend on fresh history.
+
+    Tests that assert on how the agent interprets a message (clarification
+    behavior, multi-turn flows, deletes) keep their own sessions.
+    """
+    create_response = client.post("/api/v1/conversations")
+    assert create_response.status_code == 200
+    return create_response.json()["session_id"]
+
+
+def parsed(response_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse the agent's JSON payload out of a chat response exactly once."""
+    return orjson.loads(response_data["response"])
+
+
+def assert_changelog_response(response_json: Dict[str, Any], expected_tables: list[str]):
+    """Helper to validate an already-parsed changelog response."""
     assert response_json["type"] == "changelog", "Expected changelog type"
     assert "changes" in response_json, "Missing changes field"
     
@@ -26,10 +46,8 @@ def assert_changelog_response(response_data: Dict[str, Any], expected_tables: li
         assert table in changes, f"Expected table {table} in changes"
 
 
-def assert_clarification_response(response_data: Dict[str, Any]):
-    """Helper to validate clarification response structure."""
-    response_json = json.loads(response_data["response"])
-    
+def assert_clarification_response(response_json: Dict[str, Any]):
+    """Helper to validate an already-parsed clarification response."""
     assert response_json["type"] == "clarification", "Expected clarification type"
     assert "clarification" in response_json, "Missing clarification field"
     assert len(response_json["clarification"]) > 0, "Clarification should not be empty"
@@ -45,15 +63,11 @@ def test_health_check(client):
 
 
 @pytest.mark.integration
-def test_add_single_option(client):
+def test_add_single_option(client, shared_session_id):
     """Test adding a single option to an existing form field."""
-    create_response = client.post("/api/v1/conversations")
-    assert create_response.status_code == 200
-    session_id = create_response.json()["session_id"]
-    
     request_data = {
         "message": "Add a Paris option to the travel form destination field",
-        "session_id": session_id
+        "session_id": shared_session_id
     }
     
     response = client.post("/api/v1/chat", json=request_data)
@@ -61,9 +75,10 @@ def test_add_single_option(client):
     assert response.status_code == 200
     data = response.json()
     
-    assert_changelog_response(data, ["option_items"])
+    response_json = parsed(data)
+    assert_changelog_response(response_json, ["option_items"])
     
-    changes = json.loads(data["response"])["changes"]
+    changes = response_json["changes"]
     option_items = changes["option_items"]
     
     assert "insert" in option_items
@@ -92,9 +107,10 @@ def test_add_and_update_options(client):
     assert response.status_code == 200
     data = response.json()
     
-    assert_changelog_response(data, ["option_items"])
+    response_json = parsed(data)
+    assert_changelog_response(response_json, ["option_items"])
     
-    changes = json.loads(data["response"])["changes"]
+    changes = response_json["changes"]
     option_items = changes["option_items"]
     
     assert "insert" in option_items
@@ -127,9 +143,10 @@ def test_create_conditional_logic(client):
     data = response.json()
     
     expected_tables = ["form_fields", "logic_rules", "logic_conditions", "logic_actions"]
-    assert_changelog_response(data, expected_tables)
+    response_json = parsed(data)
+    assert_changelog_response(response_json, expected_tables)
     
-    changes = json.loads(data["response"])["changes"]
+    changes = response_json["changes"]
     
     assert len(changes["form_fields"]["insert"]) >= 1
     field = changes["form_fields"]["insert"][0]
@@ -167,9 +184,10 @@ def test_create_new_form(client):
     
     # Core tables that must be present
     required_tables = ["forms", "form_fields", "option_sets", "option_items"]
-    assert_changelog_response(data, required_tables)
+    response_json = parsed(data)
+    assert_changelog_response(response_json, required_tables)
     
-    changes = json.loads(data["response"])["changes"]
+    changes = response_json["changes"]
     
     assert len(changes["forms"]["insert"]) == 1
     form = changes["forms"]["insert"][0]
@@ -204,9 +222,10 @@ def test_delete_form(client):
     assert response.status_code == 200
     data = response.json()
     
-    assert_changelog_response(data, ["forms"])
+    response_json = parsed(data)
+    assert_changelog_response(response_json, ["forms"])
     
-    changes = json.loads(data["response"])["changes"]
+    changes = response_json["changes"]
     forms = changes["forms"]
     
     assert "delete" in forms
@@ -234,9 +253,10 @@ def test_update_form_title(client):
     assert response.status_code == 200
     data = response.json()
     
-    assert_changelog_response(data, ["forms"])
+    response_json = parsed(data)
+    assert_changelog_response(response_json, ["forms"])
     
-    changes = json.loads(data["response"])["changes"]
+    changes = response_json["changes"]
     forms = changes["forms"]
     
     assert "update" in forms
@@ -265,9 +285,10 @@ def test_vague_request_clarification(client):
     assert response.status_code == 200
     data = response.json()
     
-    assert_clarification_response(data)
+    response_json = parsed(data)
+    assert_clarification_response(response_json)
     
-    clarification = json.loads(data["response"])["clarification"]
+    clarification = response_json["clarification"]
     assert "form" in clarification.lower() or "field" in clarification.lower()
 
 
@@ -288,7 +309,7 @@ def test_ambiguous_request_clarification(client):
     assert response.status_code == 200
     data = response.json()
     
-    assert_clarification_response(data)
+    assert_clarification_response(parsed(data))
 
 
 @pytest.mark.integration
@@ -308,9 +329,10 @@ def test_complex_multi_table_operation(client):
     assert response.status_code == 200
     data = response.json()
     
-    assert_changelog_response(data, ["option_items", "forms"])
+    response_json = parsed(data)
+    assert_changelog_response(response_json, ["option_items", "forms"])
     
-    changes = json.loads(data["response"])["changes"]
+    changes = response_json["changes"]
     
     assert "insert" in changes["option_items"]
     assert "delete" in changes["option_items"]
@@ -326,23 +348,21 @@ def test_complex_multi_table_operation(client):
 
 
 @pytest.mark.integration
-def test_trace_endpoint(client):
+def test_trace_endpoint(client, shared_session_id):
     """Test that trace endpoint returns trace information for a session."""
-    create_response = client.post("/api/v1/conversations")
-    assert create_response.status_code == 200
-    session_id = create_response.json()["session_id"]
-    
+    session_id = shared_session_id
+
     chat_request = {
         "message": "What forms are in the database?",
         "session_id": session_id
     }
-    
+
     chat_response = client.post("/api/v1/chat", json=chat_request)
     assert chat_response.status_code == 200
-    
+
     trace_response = client.get(f"/api/v1/traces/{session_id}")
     assert trace_response.status_code == 200
-    
+
     trace_data = trace_response.json()
     assert trace_data["session_id"] == session_id
     assert "trace_id" in trace_data
@@ -376,7 +396,7 @@ def test_multi_turn_conversation(client):
     assert first_response.status_code == 200
     
     first_data = first_response.json()
-    assert_clarification_response(first_data)
+    assert_clarification_response(parsed(first_data))
     
     second_request = {
         "message": "Add an email field to the contact form",
@@ -387,7 +407,7 @@ def test_multi_turn_conversation(client):
     assert second_response.status_code == 200
     
     second_data = second_response.json()
-    response_json = json.loads(second_data["response"])
+    response_json = parsed(second_data)
     
     assert response_json["type"] in ["changelog", "clarification"]
 
@@ -4,13 +4,13 @@ from app.agents.database_operations import create_record, update_record
 from app.agents.validators import validate_columns, ValidationError
 
 
-TEST_DB_PATH = "data/forms.sqlite"
+from tests.conftest import TEST_DB_URI as TEST_DB_PATH
 
 
 @pytest.fixture
-def setup_test_env(monkeypatch):
-    """Set the database path for tests."""
-    monkeypatch.setenv("DATABASE_PATH", TEST_DB_PATH)
+def setup_test_env(monkeypatch, test_db):
+    """Point the tool functions at the in-memory database copy."""
+    monkeypatch.setenv("DATABASE_PATH", test_db)
 
 
 @pytest.mark.asyncio
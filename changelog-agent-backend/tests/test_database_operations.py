@@ -1,22 +1,43 @@
+import asyncio
+
 import pytest
-import json
-import os
-import aiosqlite
+import pytest_asyncio
+import orjson
 from app.agents.database_operations import (
     query_database,
     create_record,
     update_record,
-    delete_record
+    delete_record,
+    validate_changes
 )
+from tests.conftest import TEST_DB_URI as TEST_DB_PATH
 
 
-TEST_DB_PATH = "data/forms.sqlite"
+# Payloads that never vary between runs, serialized once at import; only
+# the seed-dependent payloads are still built per test.
+_UPDATE_PAYLOAD = orjson.dumps({"value": "Updated Value", "label": "Updated Label"}).decode()
+_UPDATE_VALUE_ONLY_PAYLOAD = orjson.dumps({"value": "New Value"}).decode()
+_MISSING_FIELDS_PAYLOAD = orjson.dumps({"id": "$test_option"}).decode()
 
 
 @pytest.fixture
-def setup_test_env(monkeypatch):
-    """Set the database path for tests."""
-    monkeypatch.setenv("DATABASE_PATH", TEST_DB_PATH)
+def setup_test_env(monkeypatch, test_db):
+    """Point the tool functions at the in-memory database copy."""
+    monkeypatch.setenv("DATABASE_PATH", test_db)
+
+
+@pytest_asyncio.fixture(scope="module")
+async def seed(db):
+    """Existing rows the CRUD tests key off, fetched once per module."""
+    item_id, option_set_id = await asyncio.gather(
+        _get_first_option_item_id(db),
+        _get_first_option_set_id(db),
+    )
+    return {
+        "item_id": item_id,
+        "item_value": await _get_option_item_value(db, item_id),
+        "option_set_id": option_set_id,
+    }
 
 
 @pytest.mark.asyncio
@@ -25,7 +46,7 @@ async def test_query_database_success(setup_test_env):
     result = await query_database("SELECT id, title FROM forms LIMIT 1", TEST_DB_PATH)
     
     assert "Error" not in result
-    results = eval(result)
+    results = orjson.loads(result)
     assert isinstance(results, list)
     assert len(results) > 0
     assert "id" in results[0]
@@ -36,36 +57,54 @@ async def test_query_database_success(setup_test_env):
 async def test_query_database_invalid_sql(setup_test_env):
     """Test querying with invalid SQL returns an error."""
     result = await query_database("SELECT * FROM nonexistent_table", TEST_DB_PATH)
-    
+
     assert "Error" in result
 
 
 @pytest.mark.asyncio
-async def test_create_record_success(setup_test_env):
+async def test_query_database_keyword_inside_literal(setup_test_env):
+    """Test that forbidden keywords inside string literals are allowed."""
+    result = await query_database(
+        "SELECT id FROM forms WHERE title = 'update this' LIMIT 1", TEST_DB_PATH
+    )
+
+    assert "forbidden keyword" not in result
+
+
+@pytest.mark.asyncio
+async def test_query_database_builtin_replace_function(setup_test_env):
+    """Test that SELECTs may call SQLite's builtin replace() function."""
+    result = await query_database(
+        "SELECT replace(title, 'a', 'b') AS t FROM forms LIMIT 1", TEST_DB_PATH
+    )
+
+    assert "forbidden keyword" not in result
+
+
+@pytest.mark.asyncio
+async def test_create_record_success(setup_test_env, db, seed):
     """Test creating a record returns proper change plan and doesn't modify DB."""
-    valid_option_set_id = await _get_first_option_set_id()
-    
     test_data = {
         "id": "$test_option",
-        "option_set_id": valid_option_set_id,
+        "option_set_id": seed["option_set_id"],
         "value": "Test Value Unique 12345",
         "label": "Test Label",
         "position": 999,
         "is_active": 1
     }
     
-    record_count_before = await _get_option_items_count()
+    record_count_before = await _get_option_items_count(db)
     
-    result = await create_record("option_items", json.dumps(test_data), TEST_DB_PATH)
+    result = await create_record("option_items", orjson.dumps(test_data).decode(), TEST_DB_PATH)
     
     assert "Error" not in result
-    change_plan = json.loads(result)
+    change_plan = orjson.loads(result)
     assert "option_items" in change_plan
     assert "insert" in change_plan["option_items"]
     assert len(change_plan["option_items"]["insert"]) == 1
     assert change_plan["option_items"]["insert"][0]["id"] == "$test_option"
     
-    record_count_after = await _get_option_items_count()
+    record_count_after = await _get_option_items_count(db)
     assert record_count_before == record_count_after
 
 
@@ -80,46 +119,35 @@ async def test_create_record_invalid_json(setup_test_env):
 @pytest.mark.asyncio
 async def test_create_record_missing_required_field(setup_test_env):
     """Test creating a record with missing required fields returns an error."""
-    test_data = {
-        "id": "$test_option"
-    }
-    
-    result = await create_record("option_items", json.dumps(test_data), TEST_DB_PATH)
+    result = await create_record("option_items", _MISSING_FIELDS_PAYLOAD, TEST_DB_PATH)
     
     assert "Integrity constraint violation" in result or "Error" in result
 
 
 @pytest.mark.asyncio
-async def test_update_record_success(setup_test_env):
+async def test_update_record_success(setup_test_env, db, seed):
     """Test updating a record returns proper change plan and doesn't modify DB."""
-    existing_id = await _get_first_option_item_id()
-    original_value = await _get_option_item_value(existing_id)
+    existing_id = seed["item_id"]
+    original_value = seed["item_value"]
     
-    updates = {
-        "value": "Updated Value",
-        "label": "Updated Label"
-    }
-    
-    result = await update_record("option_items", existing_id, json.dumps(updates), TEST_DB_PATH)
+    result = await update_record("option_items", existing_id, _UPDATE_PAYLOAD, TEST_DB_PATH)
     
     assert "Error" not in result
-    change_plan = json.loads(result)
+    change_plan = orjson.loads(result)
     assert "option_items" in change_plan
     assert "update" in change_plan["option_items"]
     assert len(change_plan["option_items"]["update"]) == 1
     assert change_plan["option_items"]["update"][0]["id"] == existing_id
     assert change_plan["option_items"]["update"][0]["value"] == "Updated Value"
     
-    current_value = await _get_option_item_value(existing_id)
+    current_value = await _get_option_item_value(db, existing_id)
     assert current_value == original_value
 
 
 @pytest.mark.asyncio
 async def test_update_record_nonexistent_id(setup_test_env):
     """Test updating a nonexistent record returns an error."""
-    updates = {"value": "New Value"}
-    
-    result = await update_record("option_items", "nonexistent-id-123", json.dumps(updates), TEST_DB_PATH)
+    result = await update_record("option_items", "nonexistent-id-123", _UPDATE_VALUE_ONLY_PAYLOAD, TEST_DB_PATH)
     
     assert "Error: Record with id 'nonexistent-id-123' not found" in result
 
@@ -133,24 +161,24 @@ async def test_update_record_invalid_json(setup_test_env):
 
 
 @pytest.mark.asyncio
-async def test_delete_record_success(setup_test_env):
+async def test_delete_record_success(setup_test_env, db, seed):
     """Test deleting a record returns proper change plan and doesn't modify DB."""
-    existing_id = await _get_first_option_item_id()
-    record_count_before = await _get_option_items_count()
+    existing_id = seed["item_id"]
+    record_count_before = await _get_option_items_count(db)
     
     result = await delete_record("option_items", existing_id, TEST_DB_PATH)
     
     assert "Error" not in result
-    change_plan = json.loads(result)
+    change_plan = orjson.loads(result)
     assert "option_items" in change_plan
     assert "delete" in change_plan["option_items"]
     assert len(change_plan["option_items"]["delete"]) == 1
     assert change_plan["option_items"]["delete"][0]["id"] == existing_id
     
-    record_count_after = await _get_option_items_count()
+    record_count_after = await _get_option_items_count(db)
     assert record_count_before == record_count_after
     
-    record_still_exists = await _check_option_item_exists(existing_id)
+    record_still_exists = await _check_option_item_exists(db, existing_id)
     assert record_still_exists is True
 
 
@@ -162,41 +190,116 @@ async def test_delete_record_nonexistent_id(setup_test_env):
     assert "Error: Record with id 'nonexistent-id-123' not found" in result
 
 
-async def _get_option_items_count() -> int:
+async def _get_option_items_count(db) -> int:
     """Helper to count option_items in the database."""
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        async with db.execute("SELECT COUNT(*) FROM option_items") as cursor:
-            row = await cursor.fetchone()
-            return row[0]
+    async with db.execute("SELECT COUNT(*) FROM option_items") as cursor:
+        row = await cursor.fetchone()
+        return row[0]
 
 
-async def _get_first_option_item_id() -> str:
+async def _get_first_option_item_id(db) -> str:
     """Helper to get the ID of the first option_item."""
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        async with db.execute("SELECT id FROM option_items LIMIT 1") as cursor:
-            row = await cursor.fetchone()
-            return row[0]
+    async with db.execute("SELECT id FROM option_items LIMIT 1") as cursor:
+        row = await cursor.fetchone()
+        return row[0]
 
 
-async def _get_option_item_value(item_id: str) -> str:
+async def _get_option_item_value(db, item_id: str) -> str:
     """Helper to get the value of an option_item."""
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        async with db.execute("SELECT value FROM option_items WHERE id = ?", (item_id,)) as cursor:
-            row = await cursor.fetchone()
-            return row[0] if row else None
+    async with db.execute("SELECT value FROM option_items WHERE id = ?", (item_id,)) as cursor:
+        row = await cursor.fetchone()
+        return row[0] if row else None
 
 
-async def _check_option_item_exists(item_id: str) -> bool:
+async def _check_option_item_exists(db, item_id: str) -> bool:
     """Helper to check if an option_item exists."""
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        async with db.execute("SELECT 1 FROM option_items WHERE id = ?", (item_id,)) as cursor:
-            row = await cursor.fetchone()
-            return row is not None
+    async with db.execute("SELECT 1 FROM option_items WHERE id = ?", (item_id,)) as cursor:
+        row = await cursor.fetchone()
+        return row is not None
 
 
-async def _get_first_option_set_id() -> str:
+async def _get_first_option_set_id(db) -> str:
     """Helper to get the ID of the first option_set."""
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        async with db.execute("SELECT id FROM option_sets LIMIT 1") as cursor:
-            row = await cursor.fetchone()
-            return row[0] if row else None
+    async with db.execute("SELECT id FROM option_sets LIMIT 1") as cursor:
+        row = await cursor.fetchone()
+        return row[0] if row else None
+
+
+@pytest.mark.asyncio
+async def test_validate_changes_batch_success(setup_test_env, db, seed):
+    """Test validating a batch of operations returns a merged change plan."""
+    valid_option_set_id = seed["option_set_id"]
+    existing_id = seed["item_id"]
+    
+    operations = [
+        {
+            "action": "insert",
+            "table_name": "option_items",
+            "data": {
+                "id": "$batch_option",
+                "option_set_id": valid_option_set_id,
+                "value": "Batch Value 12345",
+                "label": "Batch Label",
+                "position": 998,
+                "is_active": 1
+            }
+        },
+        {
+            "action": "update",
+            "table_name": "option_items",
+            "record_id": existing_id,
+            "updates": {"label": "Batch Updated Label"}
+        }
+    ]
+    
+    record_count_before = await _get_option_items_count(db)
+    
+    result = await validate_changes(orjson.dumps(operations).decode(), TEST_DB_PATH)
+    
+    assert "Error" not in result
+    change_plan = orjson.loads(result)
+    assert "option_items" in change_plan
+    assert len(change_plan["option_items"]["insert"]) == 1
+    assert change_plan["option_items"]["insert"][0]["id"] == "$batch_option"
+    assert len(change_plan["option_items"]["update"]) == 1
+    assert change_plan["option_items"]["update"][0]["id"] == existing_id
+    
+    record_count_after = await _get_option_items_count(db)
+    assert record_count_before == record_count_after
+
+
+@pytest.mark.asyncio
+async def test_validate_changes_invalid_action(setup_test_env):
+    """Test that an unknown action is rejected before touching the database."""
+    operations = [{"action": "upsert", "table_name": "option_items", "data": {"id": "$x"}}]
+    
+    result = await validate_changes(orjson.dumps(operations).decode(), TEST_DB_PATH)
+    
+    assert "Validation error" in result
+    assert "invalid action" in result
+
+
+@pytest.mark.asyncio
+async def test_validate_changes_invalid_table(setup_test_env):
+    """Test that an invalid table anywhere in the batch rejects the whole batch."""
+    operations = [
+        {"action": "delete", "table_name": "option_items", "record_id": "some-id"},
+        {"action": "delete", "table_name": "evil_table", "record_id": "some-id"}
+    ]
+    
+    result = await validate_changes(orjson.dumps(operations).decode(), TEST_DB_PATH)
+    
+    assert "Validation error" in result
+    assert "Invalid table name" in result
+
+
+@pytest.mark.asyncio
+async def test_validate_changes_nonexistent_record(setup_test_env):
+    """Test that a missing record fails the batch with a clear error."""
+    operations = [
+        {"action": "delete", "table_name": "option_items", "record_id": "nonexistent-id-123"}
+    ]
+    
+    result = await validate_changes(orjson.dumps(operations).decode(), TEST_DB_PATH)
+    
+    assert "Error: Record with id 'nonexistent-id-123' not found" in result
@@ -1,6 +1,7 @@
+import sqlite3
+
 import pytest
-import json
-import aiosqlite
+import orjson
 from app.agents.database_operations import (
     create_record,
     update_record,
@@ -9,34 +10,30 @@ from app.agents.database_operations import (
 from app.agents.validators import validate_table_name, ValidationError, VALID_TABLES
 
 
-TEST_DB_PATH = "/Users/brycepardo/Documents/Fall 2025/form-builder/forms.sqlite"
-
-
 @pytest.mark.asyncio
-async def test_table_whitelist_validation_reject():
+async def test_table_whitelist_validation_reject(test_db):
     """Test that invalid table names are rejected."""
-    result = await create_record("malicious_table", json.dumps({"id": "test"}), TEST_DB_PATH)
+    result = await create_record("malicious_table", orjson.dumps({"id": "test"}).decode(), test_db)
     
     assert "Validation error" in result
     assert "Invalid table name" in result
     assert "malicious_table" in result
 
 
-@pytest.mark.asyncio
-async def test_table_whitelist_validation_accept():
+@pytest.mark.parametrize("table", sorted(VALID_TABLES))
+def test_table_whitelist_validation_accept(table):
     """Test that valid table names are accepted."""
-    for table in VALID_TABLES:
-        try:
-            validate_table_name(table)
-        except ValidationError:
-            pytest.fail(f"Valid table {table} was rejected")
+    try:
+        validate_table_name(table)
+    except ValidationError:
+        pytest.fail(f"Valid table {table} was rejected")
 
 
 @pytest.mark.asyncio
-async def test_table_whitelist_sql_injection_attempt():
+async def test_table_whitelist_sql_injection_attempt(test_db):
     """Test that SQL injection attempts via table name are blocked."""
     malicious_table = "forms; DROP TABLE forms; --"
-    result = await create_record(malicious_table, json.dumps({"id": "test"}), TEST_DB_PATH)
+    result = await create_record(malicious_table, orjson.dumps({"id": "test"}).decode(), test_db)
     
     assert "Validation error" in result
 
@@ -44,9 +41,9 @@ async def test_table_whitelist_sql_injection_attempt():
 
 
 @pytest.mark.asyncio
-async def test_unique_constraint_violation():
+async def test_unique_constraint_violation(sync_db, test_db):
     """Test that unique constraint violations return explicit errors."""
-    existing_form = await _get_first_form()
+    existing_form = _get_first_form(sync_db)
     
     duplicate_form = {
         "id": "new-unique-id",
@@ -55,13 +52,13 @@ async def test_unique_constraint_violation():
         "status": "draft"
     }
     
-    result = await create_record("forms", json.dumps(duplicate_form), TEST_DB_PATH)
+    result = await create_record("forms", orjson.dumps(duplicate_form).decode(), test_db)
     
     assert "Integrity constraint violation" in result or "UNIQUE constraint failed" in result
 
 
 @pytest.mark.asyncio
-async def test_check_constraint_violation():
+async def test_check_constraint_violation(test_db):
     """Test that CHECK constraint violations return explicit errors."""
     invalid_form = {
         "id": "test-invalid-status",
@@ -70,15 +67,15 @@ async def test_check_constraint_violation():
         "status": "invalid_status"
     }
     
-    result = await create_record("forms", json.dumps(invalid_form), TEST_DB_PATH)
+    result = await create_record("forms", orjson.dumps(invalid_form).decode(), test_db)
     
     assert "Integrity constraint violation" in result or "CHECK constraint failed" in result
 
 
 @pytest.mark.asyncio
-async def test_transaction_rollback_guarantees_no_changes():
+async def test_transaction_rollback_guarantees_no_changes(sync_db, test_db):
     """Test that failed operations don't leave partial changes."""
-    initial_count = await _get_forms_count()
+    initial_count = _get_forms_count(sync_db)
     
     invalid_form = {
         "id": "test-rollback",
@@ -87,83 +84,65 @@ async def test_transaction_rollback_guarantees_no_changes():
         "status": "invalid_status"
     }
     
-    result = await create_record("forms", json.dumps(invalid_form), TEST_DB_PATH)
+    result = await create_record("forms", orjson.dumps(invalid_form).decode(), test_db)
     
     assert "Integrity constraint violation" in result or "CHECK constraint failed" in result
     
-    final_count = await _get_forms_count()
+    final_count = _get_forms_count(sync_db)
     assert initial_count == final_count
 
 
 @pytest.mark.asyncio
-async def test_successful_operations_still_rollback():
+async def test_successful_operations_still_rollback(sync_db, test_db):
     """Test that even successful test operations rollback correctly."""
-    initial_count = await _get_option_items_count()
+    initial_count = _get_option_items_count(sync_db)
     
     valid_item = {
         "id": "test-item-rollback",
-        "option_set_id": await _get_first_option_set_id(),
+        "option_set_id": _get_first_option_set_id(sync_db),
         "value": "test-unique-value-12345",
         "label": "Test Label",
         "position": 999,
         "is_active": 1
     }
     
-    result = await create_record("option_items", json.dumps(valid_item), TEST_DB_PATH)
+    result = await create_record("option_items", orjson.dumps(valid_item).decode(), test_db)
     
     assert "Error" not in result
     assert "option_items" in result
     
-    final_count = await _get_option_items_count()
+    final_count = _get_option_items_count(sync_db)
     assert initial_count == final_count
 
 
-async def _get_first_form_page_id() -> str:
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
-        async with db.execute("SELECT id FROM form_pages LIMIT 1") as cursor:
-            row = await cursor.fetchone()
-            return row[0] if row else None
+# These helpers run outside the async code under test, so they use the
+# shared synchronous connection instead of an aiosqlite round-trip.
+
+def _get_first_form_page_id(conn: sqlite3.Connection) -> str:
+    row = conn.execute("SELECT id FROM form_pages LIMIT 1").fetchone()
+    return row[0] if row else None
 
 
-async def _get_form_id_with_pages() -> str:
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
-        async with db.execute(
-            "SELECT form_id FROM form_pages GROUP BY form_id HAVING COUNT(*) > 0 LIMIT 1"
-        ) as cursor:
-            row = await cursor.fetchone()
-            return row[0] if row else None
+def _get_form_id_with_pages(conn: sqlite3.Connection) -> str:
+    row = conn.execute(
+        "SELECT form_id FROM form_pages GROUP BY form_id HAVING COUNT(*) > 0 LIMIT 1"
+    ).fetchone()
+    return row[0] if row else None
 
 
-async def _get_first_form() -> dict:
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
-        db.row_factory = aiosqlite.Row
-        async with db.execute("SELECT * FROM forms LIMIT 1") as cursor:
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+def _get_first_form(conn: sqlite3.Connection) -> dict:
+    row = conn.execute("SELECT * FROM forms LIMIT 1").fetchone()
+    return dict(row) if row else None
 
 
-async def _get_forms_count() -> int:
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
-        async with db.execute("SELECT COUNT(*) FROM forms") as cursor:
-            row = await cursor.fetchone()
-            return row[0]
+def _get_forms_count(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COUNT(*) FROM forms").fetchone()[0]
 
 
-async def _get_option_items_count() -> int:
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
-        async with db.execute("SELECT COUNT(*) FROM option_items") as cursor:
-            row = await cursor.fetchone()
-            return row[0]
+def _get_option_items_count(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COUNT(*) FROM option_items").fetchone()[0]
 
 
-async def _get_first_option_set_id() -> str:
-    async with aiosqlite.connect(TEST_DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
-        async with db.execute("SELECT id FROM option_sets LIMIT 1") as cursor:
-            row = await cursor.fetchone()
-            return row[0] if row else None
+def _get_first_option_set_id(conn: sqlite3.Connection) -> str:
+    row = conn.execute("SELECT id FROM option_sets LIMIT 1").fetchone()
+    return row[0] if row else None